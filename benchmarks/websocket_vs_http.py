@@ -0,0 +1,98 @@
+"""Benchmark the per-message cost of the WebSocket stream against the HTTP endpoint.
+
+Both clients reuse a single connection, so the difference is the per-request HTTP
+and validation overhead. Every message has a distinct content, so each one is
+rendered instead of being served from the render cache.
+
+Both clients are warmed up first, then the measured rounds alternate which one runs
+first, so neither benefits from a warmer server. The median of the per-message times
+is reported, as it is not skewed by the occasional slow message.
+
+Usage Example:
+    uvicorn main:app
+    python benchmarks/websocket_vs_http.py --url http://127.0.0.1:8000 -n 2000
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from itertools import count
+
+import httpx
+from websockets.sync.client import connect
+from websockets.sync.connection import Connection
+
+MessageSender = Callable[[str], None]
+
+
+def http_sender(client: httpx.Client) -> MessageSender:
+    """Get a function creating a QR code with `POST /qrcode/`."""
+
+    def send(content: str) -> None:
+        response = client.post("/qrcode/", params={"content": content})
+        response.raise_for_status()
+
+    return send
+
+
+def websocket_sender(websocket: Connection) -> MessageSender:
+    """Get a function creating a QR code through the `/qrcode/ws` stream."""
+
+    def send(content: str) -> None:
+        websocket.send(content)
+        body = websocket.recv()
+        assert isinstance(body, bytes), body
+
+    return send
+
+
+def measure(send: MessageSender, prefix: str, messages: int) -> list[float]:
+    """Get the seconds taken by each of `messages` distinct messages."""
+    timings = []
+    for index in range(messages):
+        start = time.perf_counter()
+        send(f"{prefix} {index}")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Run both benchmarks and print their median per-message cost."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("-n", "--messages", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--warm-up", type=int, default=200)
+    args = parser.parse_args()
+
+    ws_url = args.url.replace("http", "ws", 1) + "/qrcode/ws"
+    with httpx.Client(base_url=args.url) as client, connect(ws_url) as websocket:
+        senders = {
+            "HTTP POST /qrcode/": (http_sender(client), "HTTP"),
+            "WebSocket stream": (websocket_sender(websocket), "WS"),
+        }
+        rounds = count()
+        for send, prefix in senders.values():
+            measure(send, f"{prefix} WARM UP", args.warm_up)
+
+        timings: dict[str, list[float]] = {name: [] for name in senders}
+        for round_index in range(args.rounds):
+            names = list(senders)
+            if round_index % 2:
+                names.reverse()
+            for name in names:
+                send, prefix = senders[name]
+                timings[name] += measure(
+                    send, f"{prefix} {next(rounds)}", args.messages
+                )
+
+    medians = {name: statistics.median(values) for name, values in timings.items()}
+    for name, median in medians.items():
+        print(f"{name + ':':20} {median * 1e6:8.1f} us/message (median)")
+    http_median, websocket_median = medians.values()
+    print(f"{'Speedup:':20} {http_median / websocket_median:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
 from .logging.log import setup_logging
+from .settings import settings
 
-__all__ = ["setup_logging"]
+__all__ = ["settings", "setup_logging"]
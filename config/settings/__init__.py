@@ -0,0 +1,2 @@
+from .settings import Settings as Settings
+from .settings import settings as settings
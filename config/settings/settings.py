@@ -0,0 +1,51 @@
+"""Provides the runtime settings of the application, read from the environment.
+
+Every setting has a safe default so the application runs without any environment
+variable set. Optional features, like the profiling endpoints, are disabled unless
+explicitly turned on.
+
+Usage Example:
+    from config import settings
+    if settings.profiling_enabled:
+        ...
+"""
+
+import os
+
+TRUTHY_VALUES = {"1", "true", "yes", "on"}
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUTHY_VALUES
+
+
+def _get_int(name: str, default: int) -> int:
+    """Read an integer from the environment."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+class Settings:
+    """A class holding the runtime settings of the application."""
+
+    def __init__(self) -> None:
+        """Initialize a Settings instance from the environment variables."""
+        self.profiling_enabled = _get_bool("QRCODE_PROFILING_ENABLED")
+        self.profiling_token = os.getenv("QRCODE_PROFILING_TOKEN", "")
+
+        # Pre-fork server settings, see `server.py`.
+        self.host = os.getenv("QRCODE_HOST", "127.0.0.1")
+        self.port = _get_int("QRCODE_PORT", 8000)
+        self.workers = _get_int("QRCODE_WORKERS", os.cpu_count() or 1)
+        self.max_requests = _get_int("QRCODE_MAX_REQUESTS", 0)
+        self.max_requests_jitter = _get_int("QRCODE_MAX_REQUESTS_JITTER", 0)
+        self.graceful_timeout = _get_int("QRCODE_GRACEFUL_TIMEOUT", 30)
+
+
+settings = Settings()
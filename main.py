@@ -1,17 +1,39 @@
-"""Module defining a FastAPI application with a QR code router."""
+"""Module defining a FastAPI application with a QR code router.
+
+The admin profiling router is only mounted when `QRCODE_PROFILING_ENABLED` is set.
+"""
 
 from pathlib import Path
 
 from fastapi import FastAPI
 
-from config import setup_logging
+from config import settings, setup_logging
 from src.routers import qrcode_router
 
 # Logging Configuration.
 LOGGING_CONFIG_PATH = Path("logging.toml")
 setup_logging(LOGGING_CONFIG_PATH)
 
-# FastAPI instance configurations.
-app = FastAPI()
 
-app.include_router(qrcode_router)
+def create_app() -> FastAPI:
+    """
+    Create the FastAPI instance with its routers.
+
+    Returns
+    -------
+    FastAPI
+        The application, with the profiling router only if profiling is enabled.
+    """
+    app = FastAPI()
+    app.include_router(qrcode_router)
+
+    if settings.profiling_enabled:
+        from src.profiling.router import profiling_router
+
+        app.include_router(profiling_router)
+
+    return app
+
+
+# FastAPI instance configurations.
+app = create_app()
@@ -0,0 +1,63 @@
+"""Module defining the pre-fork server entry point of the application.
+
+The application is imported, configured and warmed up once in this process, then
+served by forked uvicorn workers sharing that memory copy-on-write.
+
+Usage Example:
+    python server.py --workers 4 --max-requests 10000 --max-requests-jitter 1000
+"""
+
+import argparse
+
+from config import settings
+from main import app
+from src.qrcode_generator import KIND_MEDIA_TYPES, TEXT_KINDS, QRCode
+from src.qrcode_generator.compression import COMPRESSORS, IDENTITY
+from src.routers import render_cache
+from src.server import PreforkServer
+
+
+def warm_up() -> None:
+    """Render and compress every variant once, so the workers inherit the modules."""
+    qr_code = QRCode("WARM UP")
+    for kind in KIND_MEDIA_TYPES:
+        encodings = [IDENTITY, *COMPRESSORS] if kind in TEXT_KINDS else [IDENTITY]
+        for encoding in encodings:
+            render_cache.get(qr_code, kind=kind, encoding=encoding)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments, defaulting to the settings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--max-requests", type=int, default=settings.max_requests)
+    parser.add_argument(
+        "--max-requests-jitter", type=int, default=settings.max_requests_jitter
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=settings.graceful_timeout
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Warm up the application and run the pre-fork server."""
+    args = parse_args()
+    warm_up()
+
+    server = PreforkServer(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+    )
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
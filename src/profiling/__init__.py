@@ -0,0 +1,2 @@
+from .profiler import AllocationProfiler as AllocationProfiler
+from .profiler import SamplingProfiler as SamplingProfiler
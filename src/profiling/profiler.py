@@ -0,0 +1,214 @@
+"""A module for on-demand, time-boxed profiling of the running application.
+
+The profilers in this module cost nothing while they are inactive: no hooks are
+installed on the request path, and the sampling thread or the tracemalloc tracing
+only exist for the duration of a profile.
+"""
+
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+
+class SamplingProfiler:
+    """A class representing a sampling CPU profiler over all the running threads."""
+
+    DEFAULT_INTERVAL = 0.005
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """
+        Initialize a SamplingProfiler instance.
+
+        Parameters
+        ----------
+        interval : float, optional
+            The time between two samples in seconds. Default is 0.005.
+        """
+        if interval <= 0:
+            raise ValueError("interval should be a positive number")
+
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Check whether the profiler is currently sampling.
+
+        Returns
+        -------
+        bool
+            True if the sampling thread is alive, False otherwise.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start sampling the stacks of the running threads in a background thread.
+
+        Raises
+        ------
+        RuntimeError
+            If the profiler is already running.
+        """
+        if self.is_running:
+            raise RuntimeError("profiler is already running")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the background thread to finish."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed_stacks(self, focus: str | None = None) -> str:
+        """
+        Render the collected samples as flamegraph-compatible collapsed stacks.
+
+        Parameters
+        ----------
+        focus : str, optional
+            If given, only the stacks with a frame containing this string are kept.
+
+        Returns
+        -------
+        str
+            One `frame;frame;frame count` line per distinct stack, root frame first.
+        """
+        lines = [
+            f"{stack} {count}"
+            for stack, count in self._stacks.most_common()
+            if focus is None or focus in stack
+        ]
+        return "\n".join(lines)
+
+    def _run(self) -> None:
+        """Take a sample every `interval` seconds until the profiler is stopped."""
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        """Record the current stack of every thread but the sampling one."""
+        own_thread_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            self._stacks[self._format_stack(frame)] += 1
+        self.samples += 1
+
+    @staticmethod
+    def _format_stack(frame: FrameType | None) -> str:
+        """Format a stack, from its innermost frame, as a `;` separated string."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            filename = Path(code.co_filename).name
+            frames.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+
+class AllocationProfiler:
+    """A class representing a tracemalloc based allocation profiler."""
+
+    DEFAULT_FRAMES = 10
+
+    def __init__(self, frames: int = DEFAULT_FRAMES) -> None:
+        """
+        Initialize an AllocationProfiler instance.
+
+        Parameters
+        ----------
+        frames : int, optional
+            The number of frames stored per traced allocation. Default is 10.
+        """
+        self.frames = frames
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._peak_size: int | None = None
+
+    @property
+    def peak_size(self) -> int | None:
+        """Get the peak traced memory in bytes during the last profile, if any."""
+        return self._peak_size
+
+    def start(self) -> None:
+        """
+        Start tracing the memory allocations, from a baseline snapshot.
+
+        Raises
+        ------
+        RuntimeError
+            If tracemalloc is already tracing, e.g. started by another tool.
+        """
+        if tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is already tracing")
+
+        self._snapshot = None
+        self._peak_size = None
+        tracemalloc.start(self.frames)
+        self._baseline = self._take_snapshot()
+        # Taking the baseline should not count in the peak of the profile.
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        """Record the peak, take a snapshot of the traced allocations, stop tracing."""
+        if not tracemalloc.is_tracing():
+            return
+
+        self._peak_size = tracemalloc.get_traced_memory()[1]
+        self._snapshot = self._take_snapshot()
+        tracemalloc.stop()
+
+    def top_allocations(self, limit: int = 20) -> list[dict[str, int | str]]:
+        """
+        Get the allocation sites which grew the most since the baseline snapshot.
+
+        Parameters
+        ----------
+        limit : int, optional
+            The maximum number of allocation sites to return. Default is 20.
+
+        Returns
+        -------
+        list of dict
+            The `location` of each site, with its `size` in bytes and `count` of
+            blocks at the end of the profile, and their `size_diff` and `count_diff`
+            since its start.
+        """
+        if self._baseline is None or self._snapshot is None:
+            return []
+
+        statistics = self._snapshot.compare_to(self._baseline, "lineno")[:limit]
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in statistics
+        ]
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Take a snapshot of the traced allocations, without the profiler's own."""
+        return tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
@@ -0,0 +1,136 @@
+"""Define the admin profiling operations for FastAPI application.
+
+This router is only mounted by `main.py` when profiling is enabled, so the profilers
+are not even imported otherwise.
+"""
+
+import asyncio
+import logging
+import secrets
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+
+from .profiler import AllocationProfiler, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_profiling_token(x_profiling_token: str = Header("")) -> None:
+    """
+    Check the admin token sent with a profiling request.
+
+    Parameters
+    ----------
+    x_profiling_token : str
+        The value of the `X-Profiling-Token` request header.
+
+    Raises
+    ------
+    HTTPException
+        If no token is configured or the given token does not match it.
+    """
+    expected_token = settings.profiling_token
+    if not expected_token or not secrets.compare_digest(
+        x_profiling_token.encode(), expected_token.encode()
+    ):
+        logger.warning("Rejected profiling request with an invalid token")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token"
+        )
+
+
+profiling_router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["Profiling"],
+    dependencies=[Depends(verify_profiling_token)],
+)
+
+# Only one profile can run at a time, as tracemalloc and the samples are global.
+_profiling_lock = asyncio.Lock()
+
+
+async def _run_profile(
+    profiler: SamplingProfiler | AllocationProfiler, duration: float
+) -> None:
+    """Run the given profiler for `duration` seconds, one profile at a time."""
+    if _profiling_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another profile is already running",
+        )
+
+    async with _profiling_lock:
+        try:
+            profiler.start()
+        except RuntimeError as error:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.stop()
+
+
+@profiling_router.post("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    duration: float = Query(5.0, gt=0, le=60),
+    interval: float = Query(SamplingProfiler.DEFAULT_INTERVAL, ge=0.001, le=1),
+    focus: str | None = None,
+) -> PlainTextResponse:
+    """
+    Sample the stacks of the application during `duration` seconds.
+
+    Parameters
+    ----------
+    duration : float
+        The length of the profile in seconds.
+    interval : float
+        The time between two samples in seconds.
+    focus : str, optional
+        Keep only the stacks with a frame containing this string, e.g. `make`.
+
+    Returns
+    -------
+    PlainTextResponse
+        The samples as flamegraph-compatible collapsed stacks.
+    """
+    logger.info("Starting a CPU profile of %s seconds", duration)
+    profiler = SamplingProfiler(interval=interval)
+    await _run_profile(profiler, duration)
+    logger.info("CPU profile finished with %s samples", profiler.samples)
+
+    return PlainTextResponse(profiler.collapsed_stacks(focus=focus))
+
+
+@profiling_router.post("/memory")
+async def profile_memory(
+    duration: float = Query(5.0, gt=0, le=60),
+    limit: int = Query(20, ge=1, le=1000),
+) -> dict[str, Any]:
+    """
+    Trace the memory allocations of the application during `duration` seconds.
+
+    Parameters
+    ----------
+    duration : float
+        The length of the profile in seconds.
+    limit : int
+        The maximum number of allocation sites to return.
+
+    Returns
+    -------
+    dict
+        The `peak_size` of the traced memory in bytes, and the `top_allocations`,
+        the allocation sites which grew the most during the profile.
+    """
+    logger.info("Starting a memory profile of %s seconds", duration)
+    profiler = AllocationProfiler()
+    await _run_profile(profiler, duration)
+
+    return {
+        "peak_size": profiler.peak_size,
+        "top_allocations": profiler.top_allocations(limit=limit),
+    }
@@ -1 +1,5 @@
+from .compression import negotiate_encoding as negotiate_encoding
+from .qrcode_generator import KIND_MEDIA_TYPES as KIND_MEDIA_TYPES
+from .qrcode_generator import TEXT_KINDS as TEXT_KINDS
 from .qrcode_generator import QRCode as QRCode
+from .render_cache import RenderCache as RenderCache
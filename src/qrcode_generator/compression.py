@@ -0,0 +1,126 @@
+"""A module for negotiating and applying HTTP content encodings.
+
+Gzip is always available. Brotli and zstd are offered only when the optional
+`brotli` and `zstandard` packages are installed.
+
+The compressed bodies are cached by the render cache, but the stream of fresh
+contents mostly misses it, so moderate compression levels are used: the highest ones
+cost several times the rendering for a few percent of size.
+"""
+
+import gzip
+from collections.abc import Callable
+
+IDENTITY = "identity"
+
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    """Compress with gzip, with a fixed mtime so the output is reproducible."""
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip_compress}
+
+try:
+    import brotli
+
+    def _brotli_compress(data: bytes) -> bytes:
+        """Compress with brotli, at a moderate quality."""
+        compressed: bytes = brotli.compress(data, quality=BROTLI_QUALITY)
+        return compressed
+
+    COMPRESSORS["br"] = _brotli_compress
+except ImportError:
+    pass
+
+try:
+    import zstandard
+
+    def _zstd_compress(data: bytes) -> bytes:
+        """Compress with zstd; compressor instances are not thread-safe."""
+        compressed: bytes = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return compressed
+
+    COMPRESSORS["zstd"] = _zstd_compress
+except ImportError:
+    pass
+
+# The server preference, used to break the ties between equal quality values.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """
+    Choose the best available content encoding accepted by the client.
+
+    Parameters
+    ----------
+    accept_encoding : str, optional
+        The value of the `Accept-Encoding` request header.
+
+    Returns
+    -------
+    str
+        The chosen encoding, or `IDENTITY` if no available encoding is accepted.
+    """
+    if not accept_encoding:
+        return IDENTITY
+
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            param_name, _, param_value = param.partition("=")
+            if param_name.strip().lower() == "q":
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    default_quality = qualities.get("*", 0.0)
+    best_encoding, best_quality = IDENTITY, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in COMPRESSORS:
+            continue
+        quality = qualities.get(encoding, default_quality)
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress the data with the given content encoding.
+
+    Parameters
+    ----------
+    data : bytes
+        The data to compress.
+    encoding : str
+        The content encoding, `IDENTITY` or one of `COMPRESSORS`.
+
+    Returns
+    -------
+    bytes
+        The compressed data, or the data itself for `IDENTITY`.
+
+    Raises
+    ------
+    ValueError
+        If the encoding is not available.
+    """
+    if encoding == IDENTITY:
+        return data
+    if encoding not in COMPRESSORS:
+        raise ValueError(f"unsupported content encoding: {encoding}")
+    return COMPRESSORS[encoding](data)
@@ -4,6 +4,14 @@ import io
 
 import segno
 
+KIND_MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "eps": "application/postscript",
+}
+# Text based kinds, which compress well unlike the already deflated PNG.
+TEXT_KINDS = {"svg", "eps"}
+
 
 class QRCode:
     """A class representing a QR code generator."""
@@ -66,7 +74,7 @@ class QRCode:
 
         self._content = value
 
-    def make(self, scale: int = 10, border: int = 1) -> io.BytesIO:
+    def make(self, scale: int = 10, border: int = 1, kind: str = "png") -> io.BytesIO:
         """
         Generate a QR code.
 
@@ -76,16 +84,32 @@ class QRCode:
             The size of each module in pixels. Default is 10.
         border : int, optional
             The size of the white border around the QR code in modules. Default is 1.
+        kind : str, optional
+            The output format, one of `KIND_MEDIA_TYPES`. Default is "png".
 
         Returns
         -------
         io.BytesIO
-            A byte stream containing the PNG representation of the QR code.
+            A byte stream containing the representation of the QR code.
+
+        Raises
+        ------
+        ValueError
+            If the kind is not supported.
         """
+        if kind not in KIND_MEDIA_TYPES:
+            raise ValueError(f"kind should be one of: {', '.join(KIND_MEDIA_TYPES)}")
+
         qr = segno.make(content=self.content)
 
         byte_stream = io.BytesIO()
-        qr.save(byte_stream, kind="png", scale=scale, border=border)
+        if kind == "eps":
+            # The EPS writer of segno only writes to text streams.
+            text_stream = io.TextIOWrapper(byte_stream, encoding="ascii", newline="")
+            qr.save(text_stream, kind=kind, scale=scale, border=border)
+            text_stream.detach()
+        else:
+            qr.save(byte_stream, kind=kind, scale=scale, border=border)
 
         # Reset the stream pointer to the beginning before reading the data.
         byte_stream.seek(0)
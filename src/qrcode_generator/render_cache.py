@@ -0,0 +1,78 @@
+"""A module for caching the rendered QR codes and their compressed variants."""
+
+import threading
+from collections import OrderedDict
+
+from .compression import IDENTITY, compress
+from .qrcode_generator import QRCode
+
+
+class RenderCache:
+    """A class representing a LRU cache of rendered QR codes per content encoding."""
+
+    DEFAULT_MAXSIZE = 1024
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        """
+        Initialize a RenderCache instance.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of cached renders. Default is 1024.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, str], dict[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached renders."""
+        return len(self._entries)
+
+    def get(self, qr_code: QRCode, kind: str, encoding: str = IDENTITY) -> bytes:
+        """
+        Get a rendered QR code, rendering and compressing it on a cache miss.
+
+        The raw render and each of its compressed variants are computed only once
+        while they stay in the cache.
+
+        Parameters
+        ----------
+        qr_code : QRCode
+            The QR code to render.
+        kind : str
+            The output format of the render.
+        encoding : str, optional
+            The content encoding of the returned body. Default is `IDENTITY`.
+
+        Returns
+        -------
+        bytes
+            The rendered QR code, compressed with the given encoding.
+        """
+        key = (qr_code.content, kind)
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+                if encoding in variants:
+                    return variants[encoding]
+                raw = variants[IDENTITY]
+
+        # Render and compress outside the lock, so other keys are not blocked.
+        if variants is None:
+            raw = qr_code.make(kind=kind).getvalue()
+        body = compress(raw, encoding)
+
+        with self._lock:
+            variants = self._entries.setdefault(key, {IDENTITY: raw})
+            variants[encoding] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        """Remove all the cached renders."""
+        with self._lock:
+            self._entries.clear()
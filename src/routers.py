@@ -2,34 +2,69 @@
 
 import logging
 
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 
-from .qrcode_generator import QRCode
+from .qrcode_generator import (
+    KIND_MEDIA_TYPES,
+    TEXT_KINDS,
+    QRCode,
+    RenderCache,
+    negotiate_encoding,
+)
+from .qrcode_generator.compression import IDENTITY
 
 logger = logging.getLogger(__name__)
 
+render_cache = RenderCache()
+
+INTERNAL_ERROR_DETAIL = (
+    "Internal server error occurred while generating QR code. "
+    "Please try again or contact administration."
+)
+
 qrcode_router = APIRouter(prefix="/qrcode", tags=["QR Codes"])
 
 
 @qrcode_router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
-    responses={201: {"content": {"image/png": {}}}},
+    responses={
+        201: {"content": {media_type: {} for media_type in KIND_MEDIA_TYPES.values()}}
+    },
     response_class=Response,
 )
-async def create_qrcode(content: str) -> Response:
+async def create_qrcode(
+    content: str,
+    kind: str = "png",
+    accept_encoding: str | None = Header(None),
+) -> Response:
     """
     Create a QR code image from the provided content.
 
+    Text based kinds are compressed with the best encoding accepted by the client,
+    while PNG images, already deflated, are always sent as they are.
+
     Parameters
     ----------
     content : str
         The content to be encoded into the QR code.
+    kind : str
+        The format of the QR code image, one of `KIND_MEDIA_TYPES`.
+    accept_encoding : str, optional
+        The value of the `Accept-Encoding` request header.
 
     Returns
     -------
     Response
-        A FastAPI Response object containing the generated QR code image as PNG.
+        A FastAPI Response object containing the generated QR code image.
     """
     logger.debug("Received request to generate QR code with content: %s", content)
 
@@ -39,18 +74,102 @@ async def create_qrcode(content: str) -> Response:
         logger.error("Invalid content received %s", content, exc_info=True)
         raise HTTPException(status_code=400, detail=str(error))
 
+    if kind not in KIND_MEDIA_TYPES:
+        logger.error("Invalid kind received %s", kind)
+        raise HTTPException(
+            status_code=400,
+            detail=f"kind should be one of: {', '.join(KIND_MEDIA_TYPES)}",
+        )
+
+    headers: dict[str, str] = {}
+    encoding = IDENTITY
+    if kind in TEXT_KINDS:
+        encoding = negotiate_encoding(accept_encoding)
+        headers["Vary"] = "Accept-Encoding"
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+
     try:
-        qr_byte_stream = qr_code.make()
+        body = render_cache.get(qr_code, kind=kind, encoding=encoding)
     except Exception:
         logger.critical(
             "An unknown error happened while creating QR Code", exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail="Internal server error occurred while generating QR code. "
-            "Please try again or contact administration.",
-        )
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
     return Response(
-        status_code=201, content=qr_byte_stream.getvalue(), media_type="image/png"
+        status_code=201,
+        content=body,
+        media_type=KIND_MEDIA_TYPES[kind],
+        headers=headers,
     )
+
+
+@qrcode_router.websocket("/ws")
+async def stream_qrcodes(websocket: WebSocket, kind: str = "png") -> None:
+    """
+    Stream QR code images over a persistent WebSocket connection.
+
+    Each text message received is the content of a QR code, answered with a binary
+    message holding the image. An invalid content is answered with a text message
+    holding the JSON error, e.g. `{"detail": "content cannot be an empty string"}`,
+    and the connection stays open.
+
+    The messages of a connection are processed one at a time: the next message is
+    only read once the previous image is sent, so a client sending faster than it
+    reads is slowed down by the TCP backpressure instead of queuing work here.
+
+    Parameters
+    ----------
+    websocket : WebSocket
+        The WebSocket connection.
+    kind : str
+        The format of the QR code images of the connection, one of
+        `KIND_MEDIA_TYPES`.
+    """
+    # Accept before closing, otherwise the client only gets a bare HTTP 403 error
+    # instead of the close code and reason.
+    await websocket.accept()
+    if kind not in KIND_MEDIA_TYPES:
+        logger.error("Invalid kind received %s", kind)
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason=f"kind should be one of: {', '.join(KIND_MEDIA_TYPES)}",
+        )
+        return
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logger.debug("QR code stream closed by the client")
+                return
+
+            content = message.get("text")
+            if content is None:
+                await websocket.send_json(
+                    {"detail": "content should be a text message"}
+                )
+                continue
+            logger.debug("Received message to generate QR code: %s", content)
+
+            try:
+                qr_code = QRCode(content)
+            except ValueError as error:
+                logger.error("Invalid content received %s", content, exc_info=True)
+                await websocket.send_json({"detail": str(error)})
+                continue
+
+            try:
+                body = render_cache.get(qr_code, kind=kind)
+            except Exception:
+                logger.critical(
+                    "An unknown error happened while creating QR Code", exc_info=True
+                )
+                await websocket.send_json({"detail": INTERNAL_ERROR_DETAIL})
+                continue
+
+            await websocket.send_bytes(body)
+    except WebSocketDisconnect:
+        # Sending fails when the client disconnects while its image is rendered.
+        logger.debug("QR code stream closed by the client")
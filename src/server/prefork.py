@@ -0,0 +1,483 @@
+"""A module for serving the application with pre-forked uvicorn workers.
+
+The parent process imports the application, parses the configuration and warms it
+up once, then forks the workers. The workers share the parent memory copy-on-write
+and all accept connections from the same listening socket.
+
+The workers do not write the log files themselves: each one sends its records
+through its own pipe to the parent, which alone owns the root logger handlers
+configured by `logging.toml`, so a rotating file is only ever rotated by one process.
+A worker killed while writing only breaks its own pipe.
+
+A worker crashing soon after being spawned is replaced after an exponential backoff,
+so a worker failing at start-up does not make the parent fork in a tight loop.
+
+Signals handled by the parent process:
+    - SIGTERM, SIGINT: Gracefully stop the workers and exit.
+    - SIGHUP: Fork a fresh set of workers from the warm parent, then gracefully
+      stop the old ones while the new ones keep being supervised. The application
+      code and the configuration are not re-read; restart the server to deploy them.
+"""
+
+import copy
+import gc
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+from types import FrameType
+from typing import Any
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+
+class LogPipeHandler(logging.Handler):
+    """A class representing a log handler sending the records through a pipe."""
+
+    def __init__(self, writer: Connection) -> None:
+        """
+        Initialize a LogPipeHandler instance.
+
+        Parameters
+        ----------
+        writer : Connection
+            The write end of the pipe.
+        """
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Send a record through the pipe.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The record to send.
+        """
+        try:
+            # Merge the arguments and the traceback, which may not be picklable, into
+            # the message, like `logging.handlers.QueueHandler` does.
+            message = self.format(record)
+            record = copy.copy(record)
+            record.message = message
+            record.msg = message
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            record.stack_info = None
+            self.writer.send(record)
+        except Exception:
+            self.handleError(record)
+
+
+class LogPipeListener:
+    """A class representing a thread writing the records received from pipes."""
+
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, handlers: list[logging.Handler]) -> None:
+        """
+        Initialize a LogPipeListener instance.
+
+        Parameters
+        ----------
+        handlers : list of logging.Handler
+            The handlers writing the received records.
+        """
+        self.handlers = handlers
+        self._readers: list[Connection] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="log-pipe-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start receiving the records in a background thread."""
+        self._thread.start()
+
+    def stop(self, timeout: float) -> None:
+        """
+        Stop the listener once every pipe is closed, or after `timeout` seconds.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum seconds waited for the remaining records.
+        """
+        self._stop_event.set()
+        self._thread.join(timeout)
+
+    def add_reader(self, reader: Connection) -> None:
+        """
+        Receive the records sent through a pipe, until its write end is closed.
+
+        Parameters
+        ----------
+        reader : Connection
+            The read end of the pipe.
+        """
+        with self._lock:
+            self._readers.append(reader)
+
+    def _run(self) -> None:
+        """Write the received records until stopped and every pipe is closed."""
+        while True:
+            with self._lock:
+                readers = list(self._readers)
+            if not readers:
+                if self._stop_event.is_set():
+                    return
+                self._stop_event.wait(self.POLL_INTERVAL)
+                continue
+
+            for reader in wait(readers, timeout=self.POLL_INTERVAL):
+                assert isinstance(reader, Connection)
+                self._receive(reader)
+
+    def _receive(self, reader: Connection) -> None:
+        """Write the next record of a pipe, forgetting the pipe once closed."""
+        try:
+            record = reader.recv()
+        except Exception:
+            # The worker exited, possibly killed in the middle of a record.
+            with self._lock:
+                self._readers.remove(reader)
+            reader.close()
+            return
+
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class PreforkServer:
+    """A class representing a pre-fork server supervising uvicorn workers."""
+
+    SUPERVISE_INTERVAL = 0.5
+    # A worker exiting with an error before this many seconds counts as a crash.
+    MIN_WORKER_UPTIME = 5.0
+    CRASH_BACKOFF_BASE = 0.5
+    CRASH_BACKOFF_MAX = 30.0
+    LOG_LISTENER_STOP_TIMEOUT = 5.0
+    # The QR code stream only receives contents, at most 7089 digits, and answers
+    # each one before reading the next, so larger or queued frames are not needed.
+    WS_MAX_SIZE = 16 * 1024
+    WS_MAX_QUEUE = 4
+
+    def __init__(
+        self,
+        app: Any,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 1,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: int = 30,
+    ) -> None:
+        """
+        Initialize a PreforkServer instance.
+
+        Parameters
+        ----------
+        app : Any
+            The ASGI application served by the workers.
+        host : str, optional
+            The host to bind. Default is "127.0.0.1".
+        port : int, optional
+            The port to bind. Default is 8000.
+        workers : int, optional
+            The number of worker processes. Default is 1.
+        max_requests : int, optional
+            The number of requests after which a worker is recycled, to contain its
+            memory growth. Default is 0, which disables the recycling.
+        max_requests_jitter : int, optional
+            A random number of extra requests, up to this value, added to
+            `max_requests` per worker so the workers are not recycled all at once.
+            Default is 0.
+        graceful_timeout : int, optional
+            The seconds given to a stopping worker before it is killed. Default is
+            30.
+
+        Raises
+        ------
+        ValueError
+            If a numerical argument is out of its range.
+        """
+        if workers < 1:
+            raise ValueError("workers should be at least 1")
+        if max_requests < 0 or max_requests_jitter < 0:
+            raise ValueError("max requests and its jitter should not be negative")
+
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+
+        self._socket: socket.socket | None = None
+        self._log_listener: LogPipeListener | None = None
+        # The spawn time of each running worker, by process ID.
+        self._workers: dict[int, float] = {}
+        # The kill deadline of each stopping worker of a reload, by process ID.
+        self._draining_workers: dict[int, float] = {}
+        self._consecutive_crashes = 0
+        self._next_spawn_time = 0.0
+        self._should_exit = False
+        self._should_reload = False
+
+    def run(self) -> None:
+        """Bind the socket, fork the workers and supervise them until stopped."""
+        self._socket = self._bind_socket()
+        self._install_signal_handlers()
+        logger.info(
+            "Pre-fork server listening on %s:%s with %s workers",
+            self.host,
+            self.port,
+            self.workers,
+        )
+
+        # Move the warmed-up objects out of the collector's reach, so the workers'
+        # garbage collections do not write to, and so copy, the shared pages.
+        gc.collect()
+        gc.freeze()
+
+        self._log_listener = LogPipeListener(logging.getLogger().handlers)
+        self._log_listener.start()
+        try:
+            self._spawn_workers(self.workers)
+            self._supervise()
+        finally:
+            self._stop_workers({**self._workers, **self._draining_workers})
+            self._workers.clear()
+            self._draining_workers.clear()
+            self._socket.close()
+            # The pipes of the stopped workers are closed, so this is immediate
+            # unless a record is stuck; the timeout bounds it in any case.
+            self._log_listener.stop(timeout=self.LOG_LISTENER_STOP_TIMEOUT)
+            logger.info("Pre-fork server stopped")
+
+    def worker_max_requests(self) -> int | None:
+        """
+        Get the number of requests the next worker serves before being recycled.
+
+        Returns
+        -------
+        int or None
+            The request limit of the worker, or None if recycling is disabled.
+        """
+        if not self.max_requests:
+            return None
+        return self.max_requests + random.randint(0, self.max_requests_jitter)
+
+    def _bind_socket(self) -> socket.socket:
+        """Create the listening socket shared by all the workers."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _install_signal_handlers(self) -> None:
+        """Install the parent process signal handlers."""
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+    def _handle_exit(self, signum: int, frame: FrameType | None) -> None:
+        """Request the server to stop."""
+        self._should_exit = True
+
+    def _handle_reload(self, signum: int, frame: FrameType | None) -> None:
+        """Request the server to replace its workers."""
+        self._should_reload = True
+
+    def _supervise(self) -> None:
+        """Reap the exited workers and replace them until the server is stopped."""
+        while not self._should_exit:
+            time.sleep(self.SUPERVISE_INTERVAL)
+            self._reap_workers()
+            self._reap_draining_workers()
+
+            if self._should_reload:
+                self._should_reload = False
+                self._reload()
+
+            missing_workers = self.workers - len(self._workers)
+            if (
+                missing_workers > 0
+                and not self._should_exit
+                and time.monotonic() >= self._next_spawn_time
+            ):
+                self._spawn_workers(missing_workers)
+
+    def _reload(self) -> None:
+        """Fork a fresh set of workers, then start stopping the old ones."""
+        logger.info("Reloading the pre-fork server workers")
+        old_workers = dict(self._workers)
+        self._workers.clear()
+        self._spawn_workers(self.workers)
+
+        # The old workers are drained by the supervise loop, which keeps replacing
+        # the crashing new ones meanwhile.
+        kill_deadline = time.monotonic() + self.graceful_timeout
+        for pid in old_workers:
+            self._signal_worker(pid, signal.SIGTERM)
+            self._draining_workers[pid] = kill_deadline
+
+    def _reap_draining_workers(self) -> None:
+        """Collect the stopped old workers, killing the ones past their deadline."""
+        for pid, kill_deadline in list(self._draining_workers.items()):
+            if self._wait_worker(pid, os.WNOHANG)[0]:
+                del self._draining_workers[pid]
+                logger.info("Old worker %s stopped", pid)
+            elif time.monotonic() >= kill_deadline:
+                logger.warning("Worker %s did not stop in time, killing it", pid)
+                self._signal_worker(pid, signal.SIGKILL)
+                self._wait_worker(pid, 0)
+                del self._draining_workers[pid]
+
+    def _reap_workers(self) -> None:
+        """Collect the exit status of the exited workers."""
+        for pid, spawn_time in list(self._workers.items()):
+            exited_pid, status = self._wait_worker(pid, os.WNOHANG)
+            if not exited_pid:
+                continue
+
+            del self._workers[pid]
+            exit_code = os.waitstatus_to_exitcode(status)
+            uptime = time.monotonic() - spawn_time
+            if exit_code != 0 and uptime < self.MIN_WORKER_UPTIME:
+                self._consecutive_crashes += 1
+                backoff = min(
+                    self.CRASH_BACKOFF_MAX,
+                    self.CRASH_BACKOFF_BASE * 2 ** (self._consecutive_crashes - 1),
+                )
+                self._next_spawn_time = time.monotonic() + backoff
+                logger.error(
+                    "Worker %s crashed after %.1f seconds with code %s, "
+                    "respawning in %.1f seconds",
+                    pid,
+                    uptime,
+                    exit_code,
+                    backoff,
+                )
+            else:
+                self._consecutive_crashes = 0
+                logger.info("Worker %s exited with code %s", pid, exit_code)
+
+    def _spawn_workers(self, count: int) -> None:
+        """Fork `count` new workers."""
+        assert self._log_listener is not None, "the log listener should be running"
+
+        for _ in range(count):
+            max_requests = self.worker_max_requests()
+            log_reader, log_writer = multiprocessing.Pipe(duplex=False)
+            pid = os.fork()
+            if pid == 0:
+                log_reader.close()
+                self._run_worker(max_requests, log_writer)
+            # Only the worker keeps the write end, so the pipe closes when it exits.
+            log_writer.close()
+            self._log_listener.add_reader(log_reader)
+            self._workers[pid] = time.monotonic()
+            logger.info("Spawned worker %s", pid)
+
+    def _run_worker(self, max_requests: int | None, log_writer: Connection) -> None:
+        """Serve the application in the forked worker process, then exit."""
+        assert self._socket is not None, "the socket should be bound before forking"
+
+        # Uvicorn installs its own SIGTERM and SIGINT handlers for a graceful
+        # shutdown, then restores these ones and raises the signal again; they must
+        # exit through Python so the cleanup below still runs. A terminal hangup
+        # should only be handled by the parent.
+        signal.signal(signal.SIGTERM, self._exit_worker)
+        signal.signal(signal.SIGINT, self._exit_worker)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        random.seed()
+
+        # Replace the inherited root logger handlers by the pipe to the parent.
+        root_logger = logging.getLogger()
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(LogPipeHandler(log_writer))
+
+        exit_code = 0
+        try:
+            config = uvicorn.Config(
+                self.app,
+                limit_max_requests=max_requests,
+                timeout_graceful_shutdown=self.graceful_timeout,
+                log_config=None,
+                # PNG images are already compressed, and each deflate context costs
+                # memory per connection.
+                ws_per_message_deflate=False,
+                ws_max_size=self.WS_MAX_SIZE,
+                ws_max_queue=self.WS_MAX_QUEUE,
+            )
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except SystemExit as error:
+            # Uvicorn exits with a non-zero code when the application fails to start.
+            exit_code = error.code if isinstance(error.code, int) else 1
+            if exit_code:
+                logger.critical("Worker %s exited with code %s", os.getpid(), exit_code)
+        except BaseException:
+            logger.critical("Worker %s crashed", os.getpid(), exc_info=True)
+            exit_code = 1
+        finally:
+            # The records are sent synchronously, nothing is left to flush; the
+            # inherited handlers of the parent must not be flushed from here.
+            log_writer.close()
+            os._exit(exit_code)
+
+    @staticmethod
+    def _exit_worker(signum: int, frame: FrameType | None) -> None:
+        """Exit the worker through Python, so its cleanup runs."""
+        raise SystemExit(0)
+
+    def _stop_workers(self, workers: dict[int, float]) -> None:
+        """Gracefully stop the given workers, killing the ones that time out."""
+        for pid in workers:
+            self._signal_worker(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        remaining_pids = set(workers)
+        while remaining_pids and time.monotonic() < deadline:
+            for pid in list(remaining_pids):
+                if self._wait_worker(pid, os.WNOHANG)[0]:
+                    remaining_pids.discard(pid)
+            time.sleep(0.1)
+
+        for pid in remaining_pids:
+            logger.warning("Worker %s did not stop in time, killing it", pid)
+            self._signal_worker(pid, signal.SIGKILL)
+            self._wait_worker(pid, 0)
+
+        workers.clear()
+
+    @staticmethod
+    def _wait_worker(pid: int, options: int) -> tuple[int, int]:
+        """Wait for a worker, treating an already reaped one as exited."""
+        try:
+            return os.waitpid(pid, options)
+        except ChildProcessError:
+            return pid, 0
+
+    @staticmethod
+    def _signal_worker(pid: int, signum: int) -> None:
+        """Send a signal to a worker, ignoring the already reaped ones."""
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
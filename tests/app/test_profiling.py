@@ -0,0 +1,209 @@
+"""Test module for the profilers and the admin profiling endpoints."""
+
+import threading
+import time
+from typing import Any, Generator
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from config import settings
+from main import create_app
+from src.profiling import AllocationProfiler, SamplingProfiler
+from src.profiling.router import profiling_router
+from src.qrcode_generator import QRCode
+
+PROFILING_TOKEN = "test-token"
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Generator[TestClient, None, None]:
+    """
+    Fixture: Providing a test client of an app with the profiling router mounted.
+
+    Yields
+    ------
+    Generator[TestClient, None, None]
+        The test client.
+    """
+    monkeypatch.setattr(settings, "profiling_token", PROFILING_TOKEN)
+    app = FastAPI()
+    app.include_router(profiling_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def busy_qrcode_maker(stop_event: threading.Event) -> None:
+    """Generate QR codes until the stop event is set."""
+    while not stop_event.is_set():
+        QRCode("https://example.com").make()
+
+
+@pytest.mark.smoke
+def test_sampling_profiler_collapsed_stacks() -> None:
+    """Test that the sampled stacks contain the frames of a running thread."""
+    stop_event = threading.Event()
+    worker = threading.Thread(target=busy_qrcode_maker, args=(stop_event,))
+    profiler = SamplingProfiler(interval=0.001)
+
+    worker.start()
+    profiler.start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop_event.set()
+    worker.join()
+
+    assert not profiler.is_running
+    assert profiler.samples > 0
+
+    collapsed = profiler.collapsed_stacks(focus="busy_qrcode_maker")
+    assert collapsed, "expected samples of the busy thread"
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", maxsplit=1)
+        assert "busy_qrcode_maker" in stack
+        assert int(count) > 0
+
+
+@pytest.mark.exception
+def test_sampling_profiler_invalid_interval() -> None:
+    """Test creating a sampling profiler with a non positive interval."""
+    with pytest.raises(ValueError, match="interval should be a positive number"):
+        SamplingProfiler(interval=0)
+
+
+@pytest.mark.smoke
+def test_allocation_profiler_top_allocations() -> None:
+    """Test that the allocation profiler reports the sites grown during the profile."""
+    profiler = AllocationProfiler()
+
+    profiler.start()
+    qr_codes = [QRCode("https://example.com").make() for _ in range(5)]
+    buffers = [bytearray(100_000) for _ in range(5)]
+    profiler.stop()
+
+    top_allocations = profiler.top_allocations(limit=5)
+    assert qr_codes
+    assert 0 < len(top_allocations) <= 5
+    assert {"location", "size_diff", "size", "count_diff", "count"} == set(
+        top_allocations[0]
+    )
+    # The buffers are the largest allocation made during the profile.
+    assert str(top_allocations[0]["location"]).startswith(f"{__file__}:")
+    assert int(top_allocations[0]["size_diff"]) >= len(buffers) * 100_000
+
+
+def test_allocation_profiler_peak_size() -> None:
+    """Test that the allocation profiler reports the memory freed before its end."""
+    profiler = AllocationProfiler()
+    assert profiler.peak_size is None
+
+    profiler.start()
+    buffer = bytearray(1_000_000)
+    del buffer
+    profiler.stop()
+
+    assert profiler.peak_size is not None
+    assert profiler.peak_size >= 1_000_000
+    assert all(
+        int(allocation["size_diff"]) < 1_000_000
+        for allocation in profiler.top_allocations()
+    )
+
+
+@pytest.mark.smoke
+def test_profile_cpu_endpoint(client: TestClient) -> None:
+    """Test the CPU profiling endpoint with a valid token."""
+    response = client.post(
+        "/admin/profiling/cpu",
+        params={"duration": 0.1},
+        headers={"X-Profiling-Token": PROFILING_TOKEN},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+@pytest.mark.smoke
+def test_profile_memory_endpoint(client: TestClient) -> None:
+    """Test the memory profiling endpoint with a valid token."""
+    response = client.post(
+        "/admin/profiling/memory",
+        params={"duration": 0.1, "limit": 3},
+        headers={"X-Profiling-Token": PROFILING_TOKEN},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    profile = response.json()
+    assert profile["peak_size"] >= 0
+    assert len(profile["top_allocations"]) <= 3
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize("token", ["", "wrong-token"])
+def test_profile_endpoint_invalid_token(client: TestClient, token: str) -> None:
+    """
+    Test the profiling endpoints reject requests with an invalid token.
+
+    Parameters
+    ----------
+    token : str
+        The token sent with the request.
+    """
+    response = client.post(
+        "/admin/profiling/cpu",
+        params={"duration": 0.1},
+        headers={"X-Profiling-Token": token},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+    assert response.json() == {"detail": "Invalid profiling token"}
+
+
+@pytest.mark.exception
+def test_profile_endpoint_concurrent_profiles(client: TestClient) -> None:
+    """Test a second profile is rejected while another one is running."""
+    headers = {"X-Profiling-Token": PROFILING_TOKEN}
+    first_response: dict[str, Any] = {}
+
+    def run_first_profile() -> None:
+        """Run a long CPU profile."""
+        first_response["response"] = client.post(
+            "/admin/profiling/cpu", params={"duration": 1}, headers=headers
+        )
+
+    first_profile = threading.Thread(target=run_first_profile)
+    first_profile.start()
+    time.sleep(0.3)
+    response = client.post(
+        "/admin/profiling/memory", params={"duration": 0.1}, headers=headers
+    )
+    first_profile.join()
+
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+    assert response.json() == {"detail": "Another profile is already running"}
+    assert first_response["response"].status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize("profiling_enabled", [True, False])
+def test_profiling_router_mounted_only_when_enabled(
+    monkeypatch: pytest.MonkeyPatch, profiling_enabled: bool
+) -> None:
+    """
+    Test the application mounts the profiling router only when enabled.
+
+    Parameters
+    ----------
+    profiling_enabled : bool
+        The value of the profiling setting.
+    """
+    monkeypatch.setattr(settings, "profiling_enabled", profiling_enabled)
+    monkeypatch.setattr(settings, "profiling_token", PROFILING_TOKEN)
+    app_client = TestClient(create_app())
+
+    response = app_client.post(
+        "/admin/profiling/cpu",
+        params={"duration": 0.1},
+        headers={"X-Profiling-Token": PROFILING_TOKEN},
+    )
+    expected_status = (
+        status.HTTP_200_OK if profiling_enabled else status.HTTP_404_NOT_FOUND
+    )
+    assert response.status_code == expected_status, response.text
@@ -136,3 +136,29 @@ def test_max_length_qr_code_content(content_length: int) -> None:
     invalid_content = "a" * content_length
     with pytest.raises(ValueError, match="content length should not exceed"):
         QRCode(invalid_content)
+
+
+@pytest.mark.parametrize(
+    "kind, signature",
+    [("png", b"\x89PNG"), ("svg", b"<?xml"), ("eps", b"%!PS-Adobe")],
+)
+def test_qr_code_make_kind(kind: str, signature: bytes) -> None:
+    """
+    Test generating a QR code in each supported kind.
+
+    Parameters
+    ----------
+    kind : str
+        The output format of the QR code.
+    signature : bytes
+        The expected beginning of the output.
+    """
+    qr_bytes = QRCode("QR123").make(kind=kind)
+    assert qr_bytes.getvalue().startswith(signature)
+
+
+@pytest.mark.exception
+def test_qr_code_make_invalid_kind() -> None:
+    """Test generating a QR code in an unsupported kind."""
+    with pytest.raises(ValueError, match="kind should be one of: png, svg, eps"):
+        QRCode("QR123").make(kind="gif")
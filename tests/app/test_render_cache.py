@@ -0,0 +1,113 @@
+"""Test module for the content encoding negotiation and the render cache."""
+
+import gzip
+from unittest import mock
+
+import pytest
+
+from src.qrcode_generator import QRCode, RenderCache, negotiate_encoding
+from src.qrcode_generator.compression import COMPRESSORS, IDENTITY, compress
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, IDENTITY),
+        ("", IDENTITY),
+        ("identity", IDENTITY),
+        ("gzip", "gzip"),
+        ("GZip;q=0.5, deflate", "gzip"),
+        ("gzip;q=0", IDENTITY),
+        ("*", "gzip"),
+        ("*, gzip;q=0", IDENTITY),
+        ("br, zstd", IDENTITY),
+        ("gzip;q=invalid", IDENTITY),
+        ("gzip;foo=1;q=0", IDENTITY),
+        ("gzip; level=1 ; Q=0.2, *;q=0.1", "gzip"),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str | None, expected: str) -> None:
+    """
+    Test choosing the content encoding from the `Accept-Encoding` header.
+
+    Parameters
+    ----------
+    accept_encoding : str, optional
+        The value of the `Accept-Encoding` header.
+    expected : str
+        The expected content encoding.
+    """
+    # Only gzip is always available, the optional compressors are left out.
+    gzip_only = {"gzip": COMPRESSORS["gzip"]}
+    with mock.patch.dict(COMPRESSORS, gzip_only, clear=True):
+        assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    "module_name, encoding",
+    [("brotli", "br"), ("zstandard", "zstd")],
+)
+def test_optional_compressor(module_name: str, encoding: str) -> None:
+    """
+    Test the optional compressors, when their package is installed.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the optional package.
+    encoding : str
+        The content encoding provided by the package.
+    """
+    module = pytest.importorskip(module_name)
+    raw = QRCode("QR123").make(kind="svg").getvalue()
+
+    compressed = compress(raw, encoding)
+    if encoding == "br":
+        decompressed = module.decompress(compressed)
+    else:
+        decompressed = module.ZstdDecompressor().decompress(compressed)
+    assert decompressed == raw
+    assert len(compressed) < len(raw)
+
+    assert negotiate_encoding(f"gzip;q=0.5, {encoding}") == encoding
+    assert negotiate_encoding(f"{encoding};q=0") != encoding
+
+
+@pytest.mark.exception
+def test_compress_unsupported_encoding() -> None:
+    """Test compressing with an unavailable content encoding."""
+    with pytest.raises(ValueError, match="unsupported content encoding: deflate"):
+        compress(b"data", "deflate")
+
+
+@pytest.mark.smoke
+def test_render_cache_compresses_once() -> None:
+    """Test the render cache renders and compresses each variant only once."""
+    cache = RenderCache()
+    qr_code = QRCode("QR123")
+
+    with mock.patch.object(qr_code, "make", wraps=qr_code.make) as mocked_make:
+        raw = cache.get(qr_code, kind="svg")
+        compressed = cache.get(qr_code, kind="svg", encoding="gzip")
+        assert cache.get(qr_code, kind="svg", encoding="gzip") is compressed
+        assert cache.get(qr_code, kind="svg") is raw
+
+    mocked_make.assert_called_once_with(kind="svg")
+    assert gzip.decompress(compressed) == raw
+    assert len(compressed) < len(raw)
+
+
+def test_render_cache_evicts_least_recently_used() -> None:
+    """Test the render cache keeps at most `maxsize` renders, dropping the oldest."""
+    cache = RenderCache(maxsize=2)
+    first, second, third = QRCode("QR1"), QRCode("QR2"), QRCode("QR3")
+
+    cache.get(first, kind="png")
+    cache.get(second, kind="png")
+    cache.get(first, kind="png")
+    cache.get(third, kind="png")
+    assert len(cache) == 2
+
+    with mock.patch.object(second, "make", wraps=second.make) as mocked_make:
+        cache.get(second, kind="png")
+    mocked_make.assert_called_once()
@@ -1,16 +1,34 @@
 """Module containing test functions for QR code generation endpoint."""
 
+import gzip
+from typing import Generator
 from unittest import mock
 
 import pytest
-from fastapi import status
+from fastapi import WebSocketDisconnect, status
 from fastapi.testclient import TestClient
 
 from main import app
+from src.qrcode_generator import QRCode
+from src.routers import render_cache
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_render_cache() -> Generator[None, None, None]:
+    """
+    Fixture: Clearing the render cache, so each test renders its QR codes.
+
+    Yields
+    ------
+    Generator[None, None, None]
+    """
+    render_cache.clear()
+    yield
+    render_cache.clear()
+
+
 @pytest.mark.smoke
 @pytest.mark.parametrize(
     "content", ["QR123", "Generate QR code.", "007", "https://example.com", "Hello QR"]
@@ -89,3 +107,128 @@ def test_read_qr_code_unexpected_error() -> None:
             "detail": "Internal server error occurred while generating QR code. Please "
             "try again or contact administration."
         }
+
+
+@pytest.mark.parametrize(
+    "kind, media_type",
+    [("png", "image/png"), ("svg", "image/svg+xml"), ("eps", "application/postscript")],
+)
+def test_read_qr_code_kind(kind: str, media_type: str) -> None:
+    """
+    Test the QR code generation endpoint with each supported kind.
+
+    Parameters
+    ----------
+    kind : str
+        The format of the QR code image.
+    media_type : str
+        The expected media type of the response.
+    """
+    response = client.post(
+        "/qrcode",
+        params={"content": "QR123", "kind": kind},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert response.headers.get("content-type", None) == media_type
+    assert "content-encoding" not in response.headers
+
+
+def test_read_qr_code_invalid_kind() -> None:
+    """Test the QR code generation endpoint with an unsupported kind."""
+    response = client.post("/qrcode", params={"content": "QR123", "kind": "gif"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+    assert response.json() == {"detail": "kind should be one of: png, svg, eps"}
+
+
+def test_read_qr_code_compressed_text_kind() -> None:
+    """Test the text kinds are compressed with an accepted encoding, only once."""
+    params = {"content": "QR123", "kind": "svg"}
+    headers = {"Accept-Encoding": "br;q=0, gzip;q=0.8"}
+    response = client.post("/qrcode", params=params, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert response.headers.get("content-encoding", None) == "gzip"
+    assert response.headers.get("vary", None) == "Accept-Encoding"
+    # The test client transparently decodes the body.
+    assert response.content.startswith(b"<?xml")
+
+    with mock.patch("src.qrcode_generator.render_cache.compress") as mocked_compress:
+        cached_response = client.post("/qrcode", params=params, headers=headers)
+        mocked_compress.assert_not_called()
+    assert cached_response.content == response.content
+
+    compressed_body = render_cache.get(QRCode("QR123"), kind="svg", encoding="gzip")
+    assert gzip.decompress(compressed_body) == response.content
+
+
+def test_read_qr_code_png_not_compressed() -> None:
+    """Test the PNG images are never compressed, whatever the client accepts."""
+    response = client.post(
+        "/qrcode",
+        params={"content": "QR123"},
+        headers={"Accept-Encoding": "gzip, br, zstd"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(
+    "kind, signature",
+    [("png", b"\x89PNG"), ("svg", b"<?xml"), ("eps", b"%!PS-Adobe")],
+)
+def test_stream_qr_codes(kind: str, signature: bytes) -> None:
+    """
+    Test streaming several QR codes over one WebSocket connection.
+
+    Parameters
+    ----------
+    kind : str
+        The format of the QR code images.
+    signature : bytes
+        The expected beginning of each image.
+    """
+    with client.websocket_connect(f"/qrcode/ws?kind={kind}") as websocket:
+        for content in ["QR123", "007", "https://example.com"]:
+            websocket.send_text(content)
+            assert websocket.receive_bytes().startswith(signature)
+
+
+def test_stream_qr_codes_invalid_content() -> None:
+    """Test the WebSocket stream answers invalid messages and stays open."""
+    with client.websocket_connect("/qrcode/ws") as websocket:
+        websocket.send_text("")
+        assert websocket.receive_json() == {
+            "detail": "content cannot be an empty string"
+        }
+        websocket.send_bytes(b"QR123")
+        assert websocket.receive_json() == {
+            "detail": "content should be a text message"
+        }
+
+        websocket.send_text("QR123")
+        assert websocket.receive_bytes().startswith(b"\x89PNG")
+
+
+def test_stream_qr_codes_invalid_kind() -> None:
+    """Test the WebSocket stream rejects an unsupported kind."""
+    with client.websocket_connect("/qrcode/ws?kind=gif") as websocket:
+        with pytest.raises(WebSocketDisconnect) as error:
+            websocket.receive_bytes()
+    assert error.value.code == status.WS_1008_POLICY_VIOLATION
+    assert error.value.reason == "kind should be one of: png, svg, eps"
+
+
+def test_stream_qr_codes_unexpected_error() -> None:
+    """Test the WebSocket stream with unexpected error during generation."""
+    with mock.patch("src.routers.QRCode") as mocked_qrcode:
+        mocked_qrcode_instance = mock.MagicMock()
+        mocked_qrcode_instance.make.side_effect = Exception("Unknown Error")
+        mocked_qrcode.return_value = mocked_qrcode_instance
+
+        with client.websocket_connect("/qrcode/ws") as websocket:
+            websocket.send_text("https://example.com")
+            assert websocket.receive_json() == {
+                "detail": "Internal server error occurred while generating QR code. "
+                "Please try again or contact administration."
+            }
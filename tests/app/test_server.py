@@ -0,0 +1,266 @@
+"""Test module for the pre-fork server."""
+
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Generator
+
+import httpx
+import pytest
+from websockets.exceptions import ConnectionClosedError
+from websockets.sync.client import connect
+
+from src.server import PreforkServer
+
+PROJECT_ROOT = Path(__file__).parents[2]
+
+CRASHING_SERVER_SCRIPT = """
+import logging, os, signal, sys, threading
+from src.server import PreforkServer
+
+logging.basicConfig(
+    level=logging.INFO, stream=sys.stdout, format="%(process)d %(message)s"
+)
+threading.Timer(3, os.kill, (os.getpid(), signal.SIGTERM)).start()
+PreforkServer(app="missing_module:app", port=int(sys.argv[1])).run()
+"""
+
+
+def get_free_port() -> int:
+    """Get a free TCP port on the loopback interface."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+    return port
+
+
+def start_server(cwd: Path, *args: str) -> tuple[subprocess.Popen[bytes], str]:
+    """
+    Start the pre-fork server entry point in a subprocess and wait until it listens.
+
+    The server runs in `cwd`, with a copy of `logging.toml`, so its log file is
+    `cwd / "logs/logfile.log"`.
+
+    Parameters
+    ----------
+    cwd : Path
+        The working directory of the server.
+    *args : str
+        The extra command line arguments of the server.
+
+    Returns
+    -------
+    tuple of subprocess.Popen and str
+        The server process and its base URL.
+    """
+    shutil.copy(PROJECT_ROOT / "logging.toml", cwd)
+    port = get_free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "server.py"), f"--port={port}", *args],
+        cwd=cwd,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def server_url(tmp_path: Path) -> Generator[str, None, None]:
+    """
+    Fixture: Running the pre-fork server entry point in a subprocess.
+
+    The server runs a single worker recycled after every request, so each request
+    is served by a freshly forked worker.
+
+    Yields
+    ------
+    Generator[str, None, None]
+        The base URL of the running server.
+    """
+    process, url = start_server(
+        tmp_path, "--workers=1", "--max-requests=1", "--graceful-timeout=5"
+    )
+
+    yield url
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+
+
+@pytest.mark.smoke
+def test_prefork_server_recycles_workers(server_url: str) -> None:
+    """
+    Test the pre-fork server keeps serving while recycling its workers.
+
+    Parameters
+    ----------
+    server_url : str
+        The base URL of the running server.
+    """
+    for _ in range(3):
+        response = httpx.post(
+            f"{server_url}/qrcode/", params={"content": "QR123"}, timeout=10
+        )
+        assert response.status_code == 201, response.text
+        assert response.headers.get("content-type", None) == "image/png"
+
+
+def test_prefork_server_websocket_limits(server_url: str) -> None:
+    """
+    Test the workers stream QR codes without compression and reject large frames.
+
+    Parameters
+    ----------
+    server_url : str
+        The base URL of the running server.
+    """
+    ws_url = server_url.replace("http", "ws", 1) + "/qrcode/ws"
+    # The client offers permessage-deflate by default.
+    with connect(ws_url, max_size=None, open_timeout=10) as websocket:
+        assert websocket.response is not None
+        assert "Sec-WebSocket-Extensions" not in websocket.response.headers
+
+        websocket.send("QR123")
+        assert isinstance(websocket.recv(timeout=10), bytes)
+
+        websocket.send("1" * (PreforkServer.WS_MAX_SIZE + 1))
+        with pytest.raises(ConnectionClosedError) as error:
+            websocket.recv(timeout=10)
+    assert error.value.rcvd is not None
+    assert error.value.rcvd.code == 1009
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("kill_a_worker", [False, True])
+def test_prefork_server_graceful_stop(tmp_path: Path, kill_a_worker: bool) -> None:
+    """
+    Test the pre-fork server stops its workers gracefully, keeping their last logs.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The working directory of the server.
+    kill_a_worker : bool
+        Whether a worker is killed before the server is stopped.
+    """
+    process, url = start_server(tmp_path, "--workers=3", "--graceful-timeout=5")
+    for index in range(20):
+        response = httpx.post(
+            f"{url}/qrcode/", params={"content": f"QR{index}"}, timeout=10
+        )
+        assert response.status_code == 201, response.text
+
+    log_path = tmp_path / "logs/logfile.log"
+    worker_pids = re.findall(r"Spawned worker (\d+)", log_path.read_text())
+    assert len(worker_pids) == 3
+    if kill_a_worker:
+        killed_pid = worker_pids.pop()
+        os.kill(int(killed_pid), signal.SIGKILL)
+        time.sleep(1)
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=15) == 0
+
+    logs = log_path.read_text()
+    for pid in worker_pids:
+        assert f"Finished server process [{pid}]" in logs, logs
+    assert "Pre-fork server stopped" in logs
+
+
+@pytest.mark.exception
+def test_prefork_server_crashing_worker_backoff() -> None:
+    """Test workers failing at start-up are respawned with a growing backoff."""
+    process = subprocess.run(
+        [sys.executable, "-c", CRASHING_SERVER_SCRIPT, str(get_free_port())],
+        capture_output=True,
+        text=True,
+        timeout=20,
+    )
+    assert process.returncode == 0, process.stderr
+
+    lines = process.stdout.splitlines()
+    parent_pid = lines[0].split()[0]
+    spawned_lines = [line for line in lines if "Spawned worker" in line]
+    # Without a backoff, a worker would be respawned every 0.5 second.
+    assert 2 <= len(spawned_lines) <= 4, process.stdout
+    assert "respawning in 0.5 seconds" in process.stdout
+    assert "respawning in 1.0 seconds" in process.stdout
+
+    # The worker records reach the handlers of the parent through the log queue.
+    worker_pid = spawned_lines[0].split()[-1]
+    assert any(
+        line.startswith(f"{worker_pid} ") and "Error loading ASGI app" in line
+        for line in lines
+    ), process.stdout
+    assert parent_pid != worker_pid
+
+
+@pytest.mark.parametrize(
+    "max_requests, max_requests_jitter, expected_range",
+    [(0, 10, None), (100, 0, (100, 100)), (100, 10, (100, 110))],
+)
+def test_worker_max_requests(
+    max_requests: int,
+    max_requests_jitter: int,
+    expected_range: tuple[int, int] | None,
+) -> None:
+    """
+    Test the number of requests a worker serves before being recycled.
+
+    Parameters
+    ----------
+    max_requests : int
+        The base number of requests of a worker.
+    max_requests_jitter : int
+        The maximum random number of extra requests of a worker.
+    expected_range : tuple of int, optional
+        The inclusive bounds of the expected limit, or None if disabled.
+    """
+    server = PreforkServer(
+        app=None, max_requests=max_requests, max_requests_jitter=max_requests_jitter
+    )
+    for _ in range(20):
+        limit = server.worker_max_requests()
+        if expected_range is None:
+            assert limit is None
+        else:
+            assert limit is not None
+            assert expected_range[0] <= limit <= expected_range[1]
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"workers": 0}, "workers should be at least 1"),
+        ({"max_requests": -1}, "max requests and its jitter should not be negative"),
+        (
+            {"max_requests_jitter": -1},
+            "max requests and its jitter should not be negative",
+        ),
+    ],
+)
+def test_prefork_server_invalid_arguments(kwargs: dict[str, Any], message: str) -> None:
+    """
+    Test creating a pre-fork server with out of range arguments.
+
+    Parameters
+    ----------
+    kwargs : dict
+        The invalid keyword arguments.
+    message : str
+        The expected error message.
+    """
+    with pytest.raises(ValueError, match=message):
+        PreforkServer(app=None, **kwargs)